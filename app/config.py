@@ -0,0 +1,84 @@
+# app/config.py
+# Runtime settings, read from the environment once at import.
+# Orchestrator and mailer modules import these constants instead of calling
+# os.getenv per use. Watcher-specific knobs (LSE_EPICS, SEC_FORMS, ...) stay
+# with their watchers and are read once when the watcher is constructed.
+# Import this module first so a local .env is applied before other modules
+# read the environment.
+
+from __future__ import annotations
+import os
+from typing import Tuple
+
+
+def _load_dotenv(path: str = ".env") -> None:
+    """Fill unset variables from a local .env file.
+
+    Skipped in CI (CI=true), where variables are injected and there is no .env
+    to parse. Existing environment variables always win.
+    """
+    if os.getenv("CI", "").strip().lower() == "true" or not os.path.isfile(path):
+        return
+    try:
+        from dotenv import dotenv_values
+    except Exception:
+        return
+    for key, val in dotenv_values(path, interpolate=False).items():
+        if val is not None:
+            os.environ.setdefault(key, val)
+
+
+_load_dotenv()
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    val = os.getenv(name)
+    if val is None:
+        return default
+    return str(val).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def env_int(name: str, default: int) -> int:
+    val = os.getenv(name)
+    if val is None or not val.strip():
+        return default
+    return int(val)
+
+
+def env_float(name: str, default: float) -> float:
+    val = os.getenv(name)
+    if val is None or not val.strip():
+        return default
+    return float(val)
+
+
+def env_list(name: str) -> Tuple[str, ...]:
+    raw = os.getenv(name, "")
+    return tuple(x.strip() for x in raw.split(",") if x.strip())
+
+
+# --- Runtime ---
+DRY_RUN = env_bool("DRY_RUN", False)
+DIGEST_MODE = env_bool("DIGEST_MODE", False)
+START_FROM_DAYS = env_int("START_FROM_DAYS", 90)
+STATE_FILE = os.getenv("STATE_FILE", "data/seen.json")
+# ETag/Last-Modified cache for watcher fetches; set empty to disable
+HTTP_CACHE_FILE = os.getenv("HTTP_CACHE_FILE", "data/http_cache.json")
+# Concurrent fetch_and_summarize calls, and the cap per host among them
+FETCH_WORKERS = env_int("FETCH_WORKERS", 6)
+FETCH_PER_HOST = env_int("FETCH_PER_HOST", 2)
+
+# --- Sources ---
+ENABLE_EDGAR = env_bool("ENABLE_EDGAR", True)
+ENABLE_LSE = env_bool("ENABLE_LSE", True)
+ENABLE_IR = env_bool("ENABLE_IR", True)
+
+# --- Email (SMTP) ---
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = env_int("SMTP_PORT", 587)
+SMTP_USER = os.getenv("SMTP_USER")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+MAIL_FROM = os.getenv("MAIL_FROM") or SMTP_USER
+MAIL_TO: Tuple[str, ...] = env_list("MAIL_TO")
+# Send a NOOP before reusing a connection that has been idle this long
+SMTP_IDLE_NOOP_SECONDS = env_float("SMTP_IDLE_NOOP_SECONDS", 60.0)
@@ -1,41 +1,129 @@
 import smtplib
 import ssl
-import os
-from email.mime.text import MIMEText
+import time
+from typing import Sequence
+from email import policy
+from email.message import EmailMessage
 from email.utils import formataddr
+from ..config import SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, MAIL_FROM, MAIL_TO, SMTP_IDLE_NOOP_SECONDS
 from ..utils.log import get_logger
 
 logger = get_logger("smtp_oauth")
 
-SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
-SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
-SMTP_USER = os.getenv("SMTP_USER")
-SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
-MAIL_FROM = os.getenv("MAIL_FROM", SMTP_USER)
 
-def send_plaintext(subject: str, body: str, recipients: list[str]):
-    """
-    Send a plaintext email using STARTTLS with basic authentication.
-    If authentication fails, log error and return without raising fatal exceptions.
-    """
-    if not SMTP_USER or not SMTP_PASSWORD:
-        logger.error("SMTP credentials are missing. Cannot send email.")
-        return
+SENDER_NAME = "iGaming Earnings Watcher"
+
 
-    msg = MIMEText(body, "plain", "utf-8")
+def _build_message(subject: str, body: str, recipients: Sequence[str], from_header: str) -> EmailMessage:
+    # policy.SMTP: CRLF line endings and RFC 2047 encoding for non-ASCII headers
+    msg = EmailMessage(policy=policy.SMTP)
     msg["Subject"] = subject
-    msg["From"] = formataddr(("iGaming Earnings Watcher", MAIL_FROM))
+    msg["From"] = from_header
     msg["To"] = ", ".join(recipients)
+    msg.set_content(body, charset="utf-8", cte="base64")
+    return msg
+
+
+class SmtpSession:
+    """Authenticated SMTP connection reused across several messages.
+
+    The connection is opened lazily on the first send (STARTTLS + login once),
+    probed with NOOP after SMTP_IDLE_NOOP_SECONDS of inactivity, and re-opened
+    once if the server has dropped it.
+
+    Usage:
+        with SmtpSession() as s:
+            s.send(subject, body, recipients)
+    """
+
+    def __init__(self, mail_from: str | None = None):
+        self.mail_from = mail_from or MAIL_FROM
+        # Constant for the session; formatted once rather than per message
+        self._from_header = formataddr((SENDER_NAME, self.mail_from)) if self.mail_from else ""
+        self._server: smtplib.SMTP | None = None
+        self._last_used = 0.0
+
+    def __enter__(self) -> "SmtpSession":
+        return self
 
-    try:
-        context = ssl.create_default_context()
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30) as server:
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30)
+        try:
             server.ehlo()
-            server.starttls(context=context)
+            server.starttls(context=ssl.create_default_context())
             server.login(SMTP_USER, SMTP_PASSWORD)
-            server.sendmail(MAIL_FROM, recipients, msg.as_string())
-            logger.info("Email successfully sent to %s (subject: %s)", recipients, subject)
-    except smtplib.SMTPAuthenticationError as e:
-        logger.error("SMTP authentication failed: %s", e)
-    except Exception as e:
-        logger.error("SMTP send failed: %s", e)
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+        self._last_used = time.monotonic()
+        return server
+
+    def _ensure(self) -> smtplib.SMTP:
+        if self._server is None:
+            return self._connect()
+        if time.monotonic() - self._last_used > SMTP_IDLE_NOOP_SECONDS:
+            try:
+                self._server.noop()
+            except (smtplib.SMTPException, OSError):
+                self.close()
+                return self._connect()
+        return self._server
+
+    def send(self, subject: str, body: str, recipients: Sequence[str] | None = None) -> bool:
+        """Send one plaintext message (default recipients: MAIL_TO); log and return False on failure."""
+        if not SMTP_USER or not SMTP_PASSWORD:
+            logger.error("SMTP credentials are missing. Cannot send email.")
+            return False
+        recipients = recipients or MAIL_TO
+        if not recipients:
+            logger.error("No recipients (MAIL_TO is empty). Cannot send email.")
+            return False
+
+        # Serialise once (CRLF, wire-ready bytes); a reconnect retry resends the same payload
+        payload = _build_message(subject, body, recipients, self._from_header).as_bytes()
+        for attempt in (1, 2):
+            try:
+                server = self._ensure()
+                server.sendmail(self.mail_from, list(recipients), payload)
+                self._last_used = time.monotonic()
+                logger.info("Email successfully sent to %s (subject: %s)", recipients, subject)
+                return True
+            except smtplib.SMTPServerDisconnected as e:
+                self.close()
+                if attempt == 2:
+                    logger.error("SMTP send failed after reconnect: %s", e)
+            except smtplib.SMTPAuthenticationError as e:
+                self.close()
+                logger.error("SMTP authentication failed: %s", e)
+                return False
+            except Exception as e:
+                self.close()
+                logger.error("SMTP send failed: %s", e)
+                return False
+        return False
+
+    def close(self) -> None:
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            try:
+                self._server.close()
+            except Exception:
+                pass
+        self._server = None
+
+
+def send_plaintext(subject: str, body: str, recipients: Sequence[str] | None = None, mail_from: str | None = None) -> bool:
+    """
+    Send a single plaintext email using STARTTLS with basic authentication.
+    If authentication fails, log error and return False without raising fatal exceptions.
+    For several messages in a row, prefer SmtpSession to reuse one connection.
+    """
+    with SmtpSession(mail_from=mail_from) as session:
+        return session.send(subject, body, recipients)
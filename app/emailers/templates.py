@@ -4,12 +4,22 @@ Email rendering helpers for igwatch.
 Public API:
   - render_subject(payload: dict) -> str
   - render_body(payload: dict) -> str
+  - render_digest_subject(count: int) -> str
+  - render_digest_body(bodies: list[str]) -> str
 
 These functions expect the payload shape produced by
 app.parsers.extract.fetch_and_summarize.
 """
 from __future__ import annotations
-from typing import Dict, List
+from typing import Dict, List, Sequence
+
+DIGEST_DIV = "-" * 72
+METRIC_KEYS = (
+    ("revenue", "Revenue"),
+    ("ebitda", "Adj. EBITDA"),
+    ("net_income", "Net income"),
+    ("eps", "EPS"),
+)
 
 
 def render_subject(p: Dict[str, object]) -> str:
@@ -18,34 +28,31 @@ def render_subject(p: Dict[str, object]) -> str:
     return f"[Earnings Watch] {h}"
 
 
+def _format_metric(m: object) -> str:
+    """'current (yoy)' for one metric dict, or '' if it carries nothing."""
+    if not isinstance(m, dict):
+        return ""
+    cur = (m.get("current") or "").strip()
+    yoy = (m.get("yoy") or "").strip()
+    if yoy:
+        return f"{cur} ({yoy})" if cur else f"({yoy})"
+    return cur
+
+
 def _format_metrics(p: Dict[str, object]) -> List[str]:
-    lines: List[str] = []
-    for key, label in [
-        ("revenue", "Revenue"),
-        ("ebitda", "Adj. EBITDA"),
-        ("net_income", "Net income"),
-        ("eps", "EPS"),
-    ]:
-        m = p.get(key)
-        if isinstance(m, dict) and (m.get("current") or m.get("yoy")):
-            cur = (m.get("current") or "").strip()
-            yoy = (m.get("yoy") or "").strip()
-            val = cur
-            if yoy:
-                val = f"{val} ({yoy})" if val else f"({yoy})"
-            if val:
-                lines.append(f"{label}: {val}")
-    return lines
+    return [f"{label}: {val}" for key, label in METRIC_KEYS if (val := _format_metric(p.get(key)))]
 
 
 def render_body(p: Dict[str, object]) -> str:
     """Render a plaintext email body with headline, link, bullets and KPIs."""
-    head = str(p.get("headline", "")).strip()
-    url = str(p.get("final_url", "")).strip()
-    short = str(p.get("short_summary", "")).strip()
-    bullets: List[str] = [str(b).strip() for b in p.get("key_highlights", []) if str(b).strip()]
+    # `or ""` / `or ()`: absent or None fields render as nothing (and no
+    # throwaway default list is built per call)
+    head = str(p.get("headline") or "").strip()
+    url = str(p.get("final_url") or "").strip()
+    short = str(p.get("short_summary") or "").strip()
+    bullets: List[str] = [b for x in p.get("key_highlights") or () if (b := str(x).strip())]
     metrics = _format_metrics(p)
-    notes = str(p.get("final_thoughts", "")).strip()
+    notes = str(p.get("final_thoughts") or "").strip()
 
     lines: List[str] = []
     if head:
@@ -60,15 +67,26 @@ def render_body(p: Dict[str, object]) -> str:
     if bullets:
         lines.append("")
         lines.append("Key Highlights:")
-        lines.extend([f" - {b}" for b in bullets])
+        lines.extend(f" - {b}" for b in bullets)
 
     if metrics:
         lines.append("")
         lines.append("Metrics:")
-        lines.extend([f" - {m}" for m in metrics])
+        lines.extend(f" - {m}" for m in metrics)
 
     if notes:
         lines.append("")
         lines.append(f"Notes: {notes}")
 
     return "\n".join(lines) + "\n"
+
+
+def render_digest_subject(count: int) -> str:
+    """Subject for a single email that bundles several updates."""
+    noun = "update" if count == 1 else "updates"
+    return f"[Earnings Watch] {count} new {noun}"
+
+
+def render_digest_body(bodies: Sequence[str]) -> str:
+    """Join already-rendered bodies into one plaintext digest."""
+    return f"\n{DIGEST_DIV}\n\n".join(b.rstrip("\n") for b in bodies) + "\n"
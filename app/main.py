@@ -2,15 +2,19 @@
 # Orchestrator: run enabled watchers → fetch & parse → format email → send → persist state
 
 from __future__ import annotations
-import os
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
+from . import config
+from .utils.http import ConditionalCache
 from .utils.log import get_logger
 from .utils.state import State
 from .emailers import smtp_oauth
-from .emailers.templates import render_subject, render_body
+from .emailers.templates import render_subject, render_body, render_digest_subject, render_digest_body
 from .parsers.extract import fetch_and_summarize
 from .watchers.sec_edgar import SecEdgarWatcher
 from .watchers.rns_lse import RnsLseWatcher
@@ -18,30 +22,33 @@ from .watchers.ir_sources import IrSourcesWatcher
 
 logger = get_logger("igwatch")
 DIV = "-" * 72
+# Query parameters that only track the click and never change the document
+_TRACKING_PARAMS = frozenset({"gclid", "fbclid", "mc_cid", "mc_eid"})
 
 
-def _truthy(name: str, default: bool = False) -> bool:
-    val = os.getenv(name)
-    if val is None:
-        return default
-    return str(val).strip().lower() in {"1", "true", "yes", "on"}
-
-
-def _get_env_list(name: str) -> List[str]:
-    raw = os.getenv(name, "")
-    return [x.strip() for x in raw.split(",") if x.strip()]
+def _canon_url(url: str) -> str:
+    """Dedupe key for a URL: lowercase scheme/host, no fragment, no tracking params, sorted query."""
+    try:
+        p = urlsplit(url.strip())
+    except ValueError:
+        return url
+    query = ""
+    if p.query:
+        q = [(k, v) for k, v in parse_qsl(p.query, keep_blank_values=True)
+             if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS]
+        query = urlencode(sorted(q))
+    return urlunsplit((p.scheme.lower(), p.netloc.lower(), p.path, query, ""))
 
 
-def _send_email(subject: str, body: str) -> None:
-    if _truthy("DRY_RUN", False):
+def _send_email(subject: str, body: str, session: smtp_oauth.SmtpSession) -> bool:
+    """Send (or log, in DRY_RUN) one email. Returns False if the send failed."""
+    if config.DRY_RUN:
         logger.info("[DRY RUN] Would send email: %s\n%s", subject, body)
-        return
-    mail_to = _get_env_list("MAIL_TO")
-    mail_from = os.getenv("MAIL_FROM")
-    if not mail_to:
+        return True
+    if not config.MAIL_TO:
         logger.warning("MAIL_TO not set; skipping email send. Subject=%s", subject)
-        return
-    smtp_oauth.send_plaintext(subject, body, mail_to, mail_from=mail_from)
+        return True
+    return session.send(subject, body)
 
 
 def _iter_items_from_watcher(w) -> Iterable[Tuple[str, str]]:
@@ -69,37 +76,212 @@ def _iter_items_from_watcher(w) -> Iterable[Tuple[str, str]]:
     return safe
 
 
-def process_item(state: State, url: str, title: str) -> None:
-    if state.has(url):
-        logger.debug("Already processed: %s", url)
-        return
-
+def _summarize(url: str, title: str) -> Optional[Tuple[str, str, str]]:
+    """Fetch, summarize and render one item as (final_url, subject, body); None if there is nothing to send."""
     payload = None
     try:
         payload = fetch_and_summarize(url, title_hint=title)
     except Exception:
         logger.exception("fetch_and_summarize failed for %s", url)
-        return
+        return None
 
     if not payload:
         logger.warning("No payload for %s", url)
-        return
+        return None
+
+    # Runs on a fetch worker; a bad payload must cost this item only, not the run
+    try:
+        return payload.get("final_url") or url, render_subject(payload), render_body(payload)
+    except Exception:
+        logger.exception("Rendering failed for %s", url)
+        return None
+
+
+class _FetchPool:
+    """Runs fn(*args) jobs on `workers` threads, at most `per_host` at once per host.
+
+    A job only reaches a worker once its host has a free slot; until then it
+    waits in the queue, so a backlog for one busy host never ties up threads
+    that jobs for other hosts could use. Results come back in submit order.
+    """
+
+    def __init__(self, fn: Callable[..., Any], workers: int, per_host: int):
+        self._fn = fn
+        self._workers = max(1, workers)
+        self._per_host = max(1, per_host)
+        self._ex = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="fetch")
+        self._cv = threading.Condition()
+        self._queue: List[Tuple[int, str, tuple]] = []
+        self._running: Dict[str, int] = {}
+        self._active = 0
+        self._results: List[Any] = []
+
+    def submit(self, host: str, *args: Any) -> None:
+        with self._cv:
+            self._queue.append((len(self._results), host, args))
+            self._results.append(None)
+            ready = self._take_ready()
+        self._dispatch(ready)
+
+    def results(self) -> List[Any]:
+        """Wait for every submitted job, shut the threads down and return the results."""
+        with self._cv:
+            self._cv.wait_for(lambda: not self._queue and not self._active)
+        self._ex.shutdown()
+        return self._results
+
+    def _take_ready(self) -> List[Tuple[int, str, tuple]]:
+        # Caller holds the lock; claims worker and host slots for the jobs it returns
+        ready = []
+        i = 0
+        while i < len(self._queue) and self._active < self._workers:
+            host = self._queue[i][1]
+            if self._running.get(host, 0) < self._per_host:
+                ready.append(self._queue.pop(i))
+                self._running[host] = self._running.get(host, 0) + 1
+                self._active += 1
+            else:
+                i += 1
+        return ready
+
+    def _dispatch(self, ready: List[Tuple[int, str, tuple]]) -> None:
+        for idx, host, args in ready:
+            self._ex.submit(self._run, idx, host, args)
+
+    def _run(self, idx: int, host: str, args: tuple) -> None:
+        try:
+            result = self._fn(*args)
+        except Exception:
+            logger.exception("Fetch job failed for %s", host)
+            result = None
+        with self._cv:
+            self._results[idx] = result
+            self._running[host] -= 1
+            self._active -= 1
+            ready = self._take_ready()
+            self._cv.notify_all()
+        self._dispatch(ready)
 
-    subject = render_subject(payload)
-    body = render_body(payload)
 
+def _discover_and_fetch(state: State, watchers: List[object]) -> Tuple[List[str], List[Optional[Tuple[str, str, str]]]]:
+    """Poll all watchers and fetch their new items; returns (keys, rendered) in watcher order.
+
+    Watchers are polled concurrently. A watcher's items are handed to the
+    fetch pool once its poll and those of all earlier watchers have returned,
+    so an item seen by two watchers is always credited (title hint, order,
+    dedupe) to the first configured one, while fetching overlaps the polls
+    still running. The pool (_FetchPool) runs up to FETCH_WORKERS fetches at a
+    time and at most FETCH_PER_HOST per host. A backlog on one host therefore
+    waits in the pool's queue and doesn't hold up items that later watchers
+    release for other hosts.
+    """
+    seen_this_run: set[str] = set()
+    keys: List[str] = []
+    pool = _FetchPool(_summarize, config.FETCH_WORKERS, config.FETCH_PER_HOST)
+    try:
+        with ThreadPoolExecutor(max_workers=len(watchers), thread_name_prefix="poll") as poll_ex:
+            polls = {poll_ex.submit(_iter_items_from_watcher, w): wi for wi, w in enumerate(watchers)}
+            done: Dict[int, List[Tuple[str, str]]] = {}
+            next_wi = 0
+            for pf in as_completed(polls):
+                done[polls[pf]] = list(pf.result())
+                # Release finished polls strictly in configured order
+                while next_wi in done:
+                    items = done.pop(next_wi)
+                    logger.info(DIV)
+                    logger.info("Checking %s (%d items)", watchers[next_wi].__class__.__name__, len(items))
+                    next_wi += 1
+                    for url, title in items:
+                        # The same release often shows up under several URLs (feeds add
+                        # utm_* tags, pages add fragments); dedupe and record on the
+                        # canonical form, but still honour raw URLs saved by older runs.
+                        key = _canon_url(url)
+                        if key in seen_this_run:
+                            continue
+                        seen_this_run.add(key)
+                        if state.has(key) or state.has(url):
+                            logger.debug("Already processed: %s", url)
+                            continue
+                        keys.append(key)
+                        pool.submit(urlsplit(url).netloc.lower(), url, title)
+
+        logger.info(DIV)
+        logger.info("Fetching %d new items", len(keys))
+    finally:
+        rendered = pool.results()
+    return keys, rendered
+
+
+def _outgoing(
+    state: State, keys: Sequence[str], rendered: Sequence[Optional[Tuple[str, str, str]]]
+) -> List[Tuple[Tuple[str, ...], str, str]]:
+    """Pair rendered items with the State keys to record, dropping repeat documents.
+
+    Different entry URLs (a listing link, a feed link, a redirect) can resolve
+    to the same document. Dedupe on the canonical final URL: a document already
+    sent in an earlier run marks the new entry URL seen without emailing it
+    again; one already queued this run is simply skipped.
+    """
+    out: List[Tuple[Tuple[str, ...], str, str]] = []
+    queued: set[str] = set()
+    for key, r in zip(keys, rendered):
+        if r is None:
+            continue
+        final_url, subject, body = r
+        final_key = _canon_url(final_url)
+        if final_key in queued:
+            logger.info("Skipping %s: same document as an item already queued (%s)", key, final_key)
+            continue
+        if final_key != key and state.has(final_key):
+            logger.info("Skipping %s: %s was already sent", key, final_key)
+            state.add(key)
+            continue
+        queued.add(final_key)
+        queued.add(key)
+        out.append(((key, final_key) if final_key != key else (key,), subject, body))
+    return out
+
+
+def _deliver(state: State, urls: Sequence[str], subject: str, body: str, session: smtp_oauth.SmtpSession) -> None:
+    """Send one rendered item; mark its URLs seen only if the send succeeded."""
+    url = urls[0]
     try:
-        _send_email(subject, body)
+        sent = _send_email(subject, body, session)
     except Exception:
         logger.exception("Email send failed for %s", url)
         return
+    if not sent:
+        logger.warning("Email not sent for %s; will retry next run.", url)
+        return
 
-    state.add(url)
+    for u in urls:
+        state.add(u)
     logger.info("Sent email for %s", url)
 
 
+def _send_digest(state: State, pending: List[Tuple[Tuple[str, ...], str, str]], session: smtp_oauth.SmtpSession) -> None:
+    """Send all (urls, subject, body) items as one email; mark them seen only on success."""
+    if not pending:
+        logger.info("Digest: nothing new to send.")
+        return
+    subject = render_digest_subject(len(pending))
+    body = render_digest_body([b for _, _, b in pending])
+    try:
+        sent = _send_email(subject, body, session)
+    except Exception:
+        logger.exception("Digest send failed (%d items)", len(pending))
+        return
+    if not sent:
+        logger.warning("Digest not sent (%d items); will retry next run.", len(pending))
+        return
+    for urls, _, _ in pending:
+        for u in urls:
+            state.add(u)
+    logger.info("Sent digest with %d items", len(pending))
+
+
 def main() -> None:
-    state_path = Path(os.getenv("STATE_FILE", "data/seen.json"))
+    state_path = Path(config.STATE_FILE)
     legacy = Path("data/seen.db")
     if legacy.exists() and not state_path.exists():
         try:
@@ -110,37 +292,44 @@ def main() -> None:
             logger.exception("Could not move legacy state %s; proceeding.", legacy)
 
     state = State(state_path)
-    start_days = int(os.getenv("START_FROM_DAYS", "90"))
+    # Only the per-run listing fetches opt in (SEC submissions JSON, LSE news
+    # lists, IR feeds/pages); filings, detail pages and articles stay uncached.
+    cache = ConditionalCache(config.HTTP_CACHE_FILE) if config.HTTP_CACHE_FILE else None
+    start_days = config.START_FROM_DAYS
     watchers: List[object] = []
 
-    if _truthy("ENABLE_EDGAR", True):
-        watchers.append(SecEdgarWatcher(start_days=start_days))
-    if _truthy("ENABLE_LSE", True):
-        watchers.append(RnsLseWatcher(start_days=start_days))
-    if _truthy("ENABLE_IR", True):
-        watchers.append(IrSourcesWatcher(start_days=start_days))
+    if config.ENABLE_EDGAR:
+        watchers.append(SecEdgarWatcher(start_days=start_days, cache=cache))
+    if config.ENABLE_LSE:
+        watchers.append(RnsLseWatcher(start_days=start_days, cache=cache))
+    if config.ENABLE_IR:
+        watchers.append(IrSourcesWatcher(start_days=start_days, cache=cache))
 
     if not watchers:
         logger.warning("No watchers enabled. Set ENABLE_EDGAR/LSE/IR=true to enable sources.")
         return
 
-    seen_this_run: set[str] = set()
-    for w in watchers:
-        logger.info(DIV)
-        logger.info("Checking %s", w.__class__.__name__)
-        for url, title in _iter_items_from_watcher(w):
-            if url in seen_this_run:
-                continue
-            seen_this_run.add(url)
-            try:
-                process_item(state, url, title)
-            except Exception:
-                logger.exception("process_item failed for %s", url)
+    keys, rendered = _discover_and_fetch(state, watchers)
+
+    # Sending and state updates stay on this thread, in watcher order.
+    # One SMTP connection for the whole run; it is only opened on the first real send.
+    with smtp_oauth.SmtpSession() as session:
+        outgoing = _outgoing(state, keys, rendered)
+        if config.DIGEST_MODE:
+            _send_digest(state, outgoing, session)
+        else:
+            for urls, subject, body in outgoing:
+                _deliver(state, urls, subject, body, session)
 
     try:
         state.save()
     except Exception:
         logger.exception("Failed to persist state")
+    if cache is not None:
+        try:
+            cache.save()
+        except Exception:
+            logger.exception("Failed to persist HTTP cache")
 
 
 if __name__ == "__main__":
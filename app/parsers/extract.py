@@ -19,17 +19,17 @@ from __future__ import annotations
 import io
 import os
 import re
-import time
+import threading
 import html
 import logging
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urljoin
 
-import requests
 from bs4 import BeautifulSoup
 from dateutil import parser as dateparser
-from pdfminer.high_level import extract_text as pdf_extract_text
+
+from ..utils.http import PoliteClient
 
 LOG = logging.getLogger("igwatch")
 
@@ -42,65 +42,74 @@ DEFAULT_UA = (
 )
 HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "4"))
 HTTP_POLITE_DELAY = float(os.getenv("HTTP_POLITE_DELAY", "0.2"))
+# Documents may be PDFs as well as HTML
+FETCH_ACCEPT = "text/html,application/xhtml+xml,application/xml;q=0.9,application/pdf;q=0.9,*/*;q=0.8"
 
 # Optional: very light HTML junk removal (kept local so we don't depend on other modules)
 JUNK_SELECTORS = os.getenv(
     "JUNK_SELECTORS",
     "nav,footer,header,aside,script,style,form,.ad,.advert,[class*='ad-'],.promo,.newsletter,.subscribe,.related,.social,.share,.breadcrumbs,.tags,.paywall,.cookie,.disclaimer,#comments",
 )
+# Split once at import; the selector list is fixed for the life of the process.
+_JUNK_SELECTORS: tuple[str, ...] = tuple(x.strip() for x in JUNK_SELECTORS.split(",") if x.strip())
+# One selector list -> one tree walk, instead of one walk per selector
+_JUNK_SELECTOR_LIST = ", ".join(_JUNK_SELECTORS)
 
 # ------------------------------ HTTP ---------------------------------
 
-class _Http:
-    def __init__(self, ua: Optional[str] = None, max_retries: int = HTTP_MAX_RETRIES, polite_delay: float = HTTP_POLITE_DELAY):
-        self.s = requests.Session()
-        self.s.headers.update({
-            "User-Agent": ua or DEFAULT_UA,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,application/pdf;q=0.9,*/*;q=0.8",
-            "Accept-Encoding": "gzip, deflate",
-            "Connection": "keep-alive",
-        })
-        self.max_retries = max_retries
-        self.polite_delay = polite_delay
-
-    def get(self, url: str, **kw) -> requests.Response:
-        backoff = 0.5
-        last = None
-        for _ in range(self.max_retries):
-            r = self.s.get(url, timeout=40, **kw)
-            if r.status_code in (403, 429):
-                sleep = float(r.headers.get("Retry-After") or backoff)
-                LOG.debug("HTTP backoff %ss for %s (%s)", sleep, url, r.status_code)
-                time.sleep(sleep)
-                backoff = min(backoff * 2, 8.0)
-                last = r
-                continue
-            r.raise_for_status()
-            time.sleep(self.polite_delay)
-            return r
-        if last is not None:
-            last.raise_for_status()
-        raise RuntimeError("HTTP request failed and no response to raise")
+_CLIENT: Optional[PoliteClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def _get_client() -> PoliteClient:
+    """Process-wide client so repeat hosts (sec.gov, wires) reuse keep-alive connections."""
+    global _CLIENT
+    if _CLIENT is None:
+        # main fetches items from several threads; build the client only once
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = PoliteClient(
+                    DEFAULT_UA,
+                    accept=FETCH_ACCEPT,
+                    max_retries=HTTP_MAX_RETRIES,
+                    polite_delay=HTTP_POLITE_DELAY,
+                    timeout=40,
+                )
+    return _CLIENT
 
 
 # ---------------------------- Text Utils ------------------------------
 
 _CURRENCY = r"[$£€]"
-_NUM = r"-?\d{1,3}(?:[,\s]\d{3})*(?:\.\d+)?"  # 1,234.56 or 1234 or -1.2
+_NUM = r"-?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?"  # 1,234.56 or 1234 or -1.2
 _UNIT = r"(?:billion|bn|millions?|mn|m|thousand|k)\b"
 _PCT = r"-?\d{1,3}(?:\.\d+)?\s?%"
+_YEAR = r"(?:19|20)\d{2}"
+# A whole figure: not the tail of a word or number ("Q3", "12.5"), not a
+# percentage ("up 12%"), and not a bare year ("Q3 2025") unless a unit follows.
+_FIGURE = (
+    rf"(?<![\w.])(?:{_CURRENCY}\s*)?"
+    rf"(?!{_YEAR}(?![\d,.]?\d)(?!\s*{_UNIT}))"
+    rf"{_NUM}(?![\d,.]?\d)(?!\s?(?:%|per\s?cent))"
+)
 
 RE_WHITESPACE = re.compile(r"\s+")
 
+# Gap quantifiers are lazy: the text is whitespace-squashed (no line breaks), so a
+# greedy gap would run the full window and backtrack to the *last* number in it.
+# The figure itself is the named group "val".
 METRIC_PATTERNS = {
-    "revenue": re.compile(rf"\b(total\s+)?revenue\b[^\n\r]{{0,160}}(({_CURRENCY}\s*)?{_NUM}(?:\s*{_UNIT})?)", re.I),
-    "ebitda": re.compile(rf"\b(adjusted\s+)?ebitda\b[^\n\r]{{0,160}}(({_CURRENCY}\s*)?{_NUM}(?:\s*{_UNIT})?)", re.I),
-    "net_income": re.compile(rf"\b(net\s+(income|loss))\b[^\n\r]{{0,160}}(({_CURRENCY}\s*)?{_NUM}(?:\s*{_UNIT})?)", re.I),
-    "eps": re.compile(rf"\b(adjusted\s+)?(diluted\s+)?eps\b[^\n\r]{{0,120}}(({_CURRENCY}\s*)?{_NUM})", re.I),
+    "revenue": re.compile(rf"\b(total\s+)?revenue\b[^\n\r]{{0,160}}?(?P<val>{_FIGURE}(?:\s*{_UNIT})?)", re.I),
+    "ebitda": re.compile(rf"\b(adjusted\s+)?ebitda\b[^\n\r]{{0,160}}?(?P<val>{_FIGURE}(?:\s*{_UNIT})?)", re.I),
+    "net_income": re.compile(rf"\b(net\s+(income|loss))\b[^\n\r]{{0,160}}?(?P<val>{_FIGURE}(?:\s*{_UNIT})?)", re.I),
+    "eps": re.compile(rf"\b(adjusted\s+)?(diluted\s+)?eps\b[^\n\r]{{0,120}}?(?P<val>{_FIGURE})", re.I),
 }
 
-YOY_PAT = re.compile(rf"(yoy|year[-\s]?over[-\s]?year|vs\.\s*prior\s*year|prior\s*year)[^\n\r]{{0,40}}((up|down|increase|decrease|grew|rose|fell)\s+)?({_PCT})", re.I)
-PCT_VERB_PAT = re.compile(rf"\b(up|down|increase(?:d)?|decrease(?:d)?|grew|rose|fell)\s+({_PCT})\b", re.I)
+YOY_PAT = re.compile(rf"(yoy|year[-\s]?over[-\s]?year|vs\.\s*prior\s*year|prior\s*year)[^\n\r]{{0,40}}?((up|down|increase|decrease|grew|rose|fell)\s+)?({_PCT})", re.I)
+# (?!\d) rather than \b: "%" is not a word character, so "12% " never has a \b after it
+PCT_VERB_PAT = re.compile(rf"\b(up|down|increase(?:d)?|decrease(?:d)?|grew|rose|fell)\s+({_PCT})(?!\d)", re.I)
+# Sentence break; the capital keeps "vs. prior year" and "$1.2" in one sentence
+SENTENCE_END = re.compile(r"\.\s+(?=[A-Z])")
 
 PERIOD_PATTERNS = [
     re.compile(r"\b(Q[1-4])\s*(20\d{2})\b", re.I),
@@ -116,21 +125,35 @@ def _squash_spaces(s: str) -> str:
     return RE_WHITESPACE.sub(" ", s).strip()
 
 
+def _drop_junk(soup: BeautifulSoup) -> None:
+    """Remove nav/ads/boilerplate nodes matched by JUNK_SELECTORS in place."""
+    try:
+        nodes = soup.select(_JUNK_SELECTOR_LIST) if _JUNK_SELECTOR_LIST else []
+    except Exception:
+        # A bad selector in the env override; fall back to per-selector matching
+        nodes = []
+        for sel in _JUNK_SELECTORS:
+            try:
+                nodes.extend(soup.select(sel))
+            except Exception:
+                continue
+    for node in nodes:
+        # Matches come in document order, so children of removed blocks are already gone
+        if not node.decomposed:
+            node.decompose()
+
+
 def _clean_html(html_text: str) -> str:
     soup = BeautifulSoup(html_text, "lxml")
-    # Drop junk blocks
-    for sel in JUNK_SELECTORS.split(","):
-        try:
-            for node in soup.select(sel.strip()):
-                node.decompose()
-        except Exception:
-            continue
+    _drop_junk(soup)
     text = soup.get_text(" \n ")
     return _squash_spaces(html.unescape(text))
 
 
 def _extract_pdf_text(data: bytes) -> str:
     try:
+        # Imported lazily: pdfminer is heavy and most documents are HTML
+        from pdfminer.high_level import extract_text as pdf_extract_text
         txt = pdf_extract_text(io.BytesIO(data)) or ""
         return _squash_spaces(txt)
     except Exception as e:
@@ -140,7 +163,7 @@ def _extract_pdf_text(data: bytes) -> str:
 
 # ---------------------------- Parsing KPIs ----------------------------
 
-@dataclass
+@dataclass(slots=True)
 class Metric:
     current: Optional[str] = None
     yoy: Optional[str] = None
@@ -159,21 +182,31 @@ def _find_metric(text: str, key: str) -> Metric:
     pat = METRIC_PATTERNS[key]
     hit = pat.search(text)
     if hit:
-        m.current = _squash_spaces(hit.group(2))
-        # search nearby for YoY change
-        window_start = max(0, hit.start() - 200)
-        window_end = min(len(text), hit.end() + 200)
-        window = text[window_start:window_end]
+        m.current = _squash_spaces(hit.group("val"))
+        # Look for the YoY change in the figure's own sentence (within 200 chars);
+        # a wider window hands one metric's change to its neighbours.
+        lo = max(0, hit.start() - 200)
+        hi = min(len(text), hit.end() + 200)
+        for end in SENTENCE_END.finditer(text, lo, hit.start()):
+            lo = end.end()
+        stop = SENTENCE_END.search(text, hit.end(), hi)
+        if stop:
+            hi = stop.start()
         yoy = None
-        mdir = PCT_VERB_PAT.search(window)
-        yoy2 = YOY_PAT.search(window)
-        if yoy2:
+        # Closest first: "up 12%" right after the figure, then an explicit
+        # "year-over-year ... 12%", then the nearest "increased 12% to" before it
+        mdir = PCT_VERB_PAT.search(text, hit.end(), hi)
+        yoy2 = YOY_PAT.search(text, lo, hi) if mdir is None else None
+        if mdir is None and yoy2 is None:
+            before = list(PCT_VERB_PAT.finditer(text, lo, hit.start("val")))
+            mdir = before[-1] if before else None
+        if mdir:
+            yoy = f"{mdir.group(1)} {mdir.group(2)}"
+        elif yoy2:
             yoy = yoy2.group(4)
             verb = yoy2.group(2) or ""
             if verb:
                 yoy = f"{verb.strip()} {yoy}"
-        elif mdir:
-            yoy = f"{mdir.group(1)} {mdir.group(2)}"
         if yoy:
             m.yoy = _squash_spaces(yoy)
     return m
@@ -233,21 +266,20 @@ def _compose_summary(headline: str, period: Optional[str], metrics: Dict[str, Me
     if period:
         parts.append(f"{period} results:")
 
-    def fmt(name: str, m: Metric) -> Optional[str]:
-        if not (m.current or m.yoy):
-            return None
-        s = name
+    def fmt(m: Metric) -> Optional[str]:
+        """'current (yoy)' once per metric; reused for the summary and its bullet."""
+        if m.current and m.yoy:
+            return f"{m.current} ({m.yoy})"
         if m.current:
-            s += f" {m.current}"
-        if m.yoy:
-            s += f" ({m.yoy})"
-        return s
+            return m.current
+        return f"({m.yoy})" if m.yoy else None
 
     for k, label in ("revenue", "Revenue"), ("ebitda", "Adj. EBITDA"), ("net_income", "Net income"), ("eps", "EPS"):
-        f = fmt(label, metrics.get(k, Metric()))
-        if f:
-            parts.append(f)
-            bullets.append(f"{label}: {f.split(' ', 1)[1] if ' ' in f else ''}".strip())
+        m = metrics.get(k)
+        val = fmt(m) if m is not None else None
+        if val:
+            parts.append(f"{label} {val}")
+            bullets.append(f"{label}: {val}")
 
     short = " ".join(parts) if parts else headline
     return short, bullets
@@ -255,7 +287,7 @@ def _compose_summary(headline: str, period: Optional[str], metrics: Dict[str, Me
 
 # ------------------------------- Public ------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class _Doc:
     final_url: str
     text: str
@@ -263,8 +295,7 @@ class _Doc:
 
 
 def _fetch_text(url: str) -> _Doc:
-    client = _Http()
-    r = client.get(url, allow_redirects=True)
+    r = _get_client().get(url, allow_redirects=True)
     final_url = str(r.url)
     ctype = (r.headers.get("Content-Type") or "").lower()
 
@@ -279,13 +310,8 @@ def _fetch_text(url: str) -> _Doc:
     title_tag = soup.find("title")
     title_html = title_tag.get_text(strip=True) if title_tag else None
 
-    try:
-        # Clean the soup for better signal
-        for sel in JUNK_SELECTORS.split(","):
-            for node in soup.select(sel.strip()):
-                node.decompose()
-    except Exception:
-        pass
+    # Clean the soup for better signal
+    _drop_junk(soup)
 
     text = _squash_spaces(soup.get_text(" \n "))
     return _Doc(final_url=final_url, text=text, title_html=title_html)
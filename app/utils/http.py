@@ -0,0 +1,262 @@
+# app/utils/http.py
+# Polite HTTP client shared by the watchers and the parser.
+# All clients share one pooled, keep-alive connection adapter (connect
+# retries only) through a requests.Session per thread, and send their own
+# headers per request. Every request, retries included,
+# waits its turn behind a process-wide minimum spacing per host, and 403/429/
+# 5xx gateway errors back off honouring Retry-After. An optional
+# ConditionalCache turns repeat fetches into If-None-Match / If-Modified-Since
+# requests.
+
+from __future__ import annotations
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import get_encoding_from_headers
+from urllib3.util.retry import Retry
+
+LOG = logging.getLogger("igwatch")
+
+DEFAULT_UA = "igwatch (contact: support@example.com)"
+DEFAULT_ACCEPT = "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
+# Keep-alive connections kept per host; main fetches items from several threads
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+# Larger bodies are not kept by ConditionalCache
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(2_000_000)))
+
+
+_ADAPTER: HTTPAdapter | None = None
+_ADAPTER_LOCK = threading.Lock()
+_LOCAL = threading.local()
+# host -> monotonic time of the next allowed request, across all clients
+_NEXT_OK: dict[str, float] = {}
+_PACE_LOCK = threading.Lock()
+# Retried inside PoliteClient.get(), so each attempt is paced
+RETRY_STATUSES = frozenset({403, 429, 502, 503, 504})
+
+
+def _shared_adapter() -> HTTPAdapter:
+    """Process-wide adapter, so e.g. the SEC watcher and the parser reuse the
+    same warm connections to www.sec.gov instead of each opening their own."""
+    global _ADAPTER
+    if _ADAPTER is None:
+        with _ADAPTER_LOCK:
+            if _ADAPTER is None:
+                # Transport retries only for failed connects (nothing reached the
+                # server); status retries go through the paced loop in PoliteClient.get().
+                retry = Retry(
+                    total=2,
+                    connect=2,
+                    read=0,
+                    backoff_factor=0.5,
+                    status_forcelist=(),
+                    respect_retry_after_header=False,
+                    raise_on_status=False,
+                )
+                _ADAPTER = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    return _ADAPTER
+
+
+def _session() -> requests.Session:
+    """This thread's Session, mounted on the shared adapter.
+
+    urllib3's PoolManager behind the adapter is thread-safe, but
+    requests.Session (cookie jar, settings merge) is not documented as such,
+    so polls and fetch workers each get their own and share only connections.
+    """
+    s = getattr(_LOCAL, "session", None)
+    if s is None:
+        s = _LOCAL.session = requests.Session()
+        adapter = _shared_adapter()
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+    return s
+
+
+class ConditionalCache:
+    """URL -> (ETag, Last-Modified, body) persisted as JSON between runs.
+
+    A cached URL is requested with If-None-Match / If-Modified-Since; on a 304
+    the stored body is put back on the response, so callers parse it exactly
+    as they would a 200 (an unchanged listing still yields its items, and items
+    that failed or were dry-run last time are not lost). Only entries used in
+    the current run are written back, so URLs that drop out of rotation
+    (paged listings, old filings) expire on their own. Thread-safe.
+    """
+
+    def __init__(self, path: str | Path):
+        self._path = Path(path)
+        self._entries: dict[str, dict] = {}
+        self._used: set[str] = set()
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def validators(self, url: str) -> dict[str, str]:
+        """Conditional request headers for url ({} if nothing is cached)."""
+        with self._lock:
+            e = self._entries.get(url)
+        if not e:
+            return {}
+        h = {}
+        if e.get("etag"):
+            h["If-None-Match"] = e["etag"]
+        if e.get("last_modified"):
+            h["If-Modified-Since"] = e["last_modified"]
+        return h
+
+    def update(self, url: str, r: requests.Response) -> None:
+        """Record a 200's validators and body, or restore the cached body onto a 304."""
+        if r.status_code == 304:
+            with self._lock:
+                e = self._entries.get(url)
+                if e is not None:
+                    self._used.add(url)
+            if e is None:
+                return
+            # 304s usually omit Content-Type; restore it so .text / feedparser
+            # pick the same encoding as for the original 200.
+            if e.get("content_type"):
+                r.headers.setdefault("Content-Type", e["content_type"])
+            r.encoding = get_encoding_from_headers(r.headers)
+            r._content = e["body"].encode("latin-1")
+            return
+        if r.status_code != 200:
+            return
+        etag = r.headers.get("ETag")
+        last_modified = r.headers.get("Last-Modified")
+        if not (etag or last_modified) or len(r.content) > HTTP_CACHE_MAX_BYTES:
+            with self._lock:
+                if self._entries.pop(url, None) is not None:
+                    self._dirty = True
+            return
+        entry = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": r.headers.get("Content-Type"),
+            # latin-1 maps bytes 0-255 one-to-one, so any body round-trips through JSON
+            "body": r.content.decode("latin-1"),
+        }
+        with self._lock:
+            self._entries[url] = entry
+            self._used.add(url)
+            self._dirty = True
+
+    def save(self) -> None:
+        """Persist entries used this run atomically (write temp, fsync, rename)."""
+        with self._lock:
+            stale = self._entries.keys() - self._used
+            if not self._dirty and not stale:
+                return
+            data = {u: self._entries[u] for u in self._used if u in self._entries}
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=str(self._path.parent), delete=False) as tmp:
+            json.dump(data, tmp, separators=(",", ":"))
+            tmp.flush()
+            os.fsync(tmp.fileno())
+            tmp_path = Path(tmp.name)
+        tmp_path.replace(self._path)
+        with self._lock:
+            self._entries = data
+            self._dirty = False
+
+    def _load(self) -> None:
+        try:
+            if not self._path.exists():
+                return
+            data = json.loads(self._path.read_text(encoding="utf-8") or "{}")
+            if isinstance(data, dict):
+                self._entries = {u: e for u, e in data.items() if isinstance(e, dict) and "body" in e}
+            else:
+                LOG.warning("Unexpected JSON structure in %s; starting with an empty HTTP cache.", self._path)
+        except Exception:
+            LOG.exception("Failed to load HTTP cache from %s; starting empty.", self._path)
+            self._entries = {}
+
+
+class PoliteClient:
+    """GET client over the shared connection pool with polite pacing and retry.
+
+    `label` only prefixes log lines (e.g. "SEC", "LSE") so backoffs can be
+    traced to a source. `polite_delay` is the gap each request reserves before
+    the next one to the same host; reservations are process-wide, so all
+    clients hitting one host are spaced out together. Requests to other hosts
+    (or the last request of a run) never wait on it. With a `cache`, calls to
+    get(url, conditional=True) are conditional (see ConditionalCache); other
+    requests bypass it.
+    """
+
+    def __init__(
+        self,
+        ua: str | None = None,
+        *,
+        label: str = "HTTP",
+        accept: str = DEFAULT_ACCEPT,
+        max_retries: int = 5,
+        polite_delay: float = 0.2,
+        timeout: float = 30,
+        cache: ConditionalCache | None = None,
+    ):
+        # Per client rather than on the shared session; sent with every request
+        self.headers = {
+            "User-Agent": ua or DEFAULT_UA,
+            "Accept": accept,
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        }
+        self.label = label
+        self.max_retries = max_retries
+        self.polite_delay = polite_delay
+        self.timeout = timeout
+        self.cache = cache
+
+    def _wait_turn(self, url: str) -> None:
+        """Reserve the next slot for url's host and sleep until it comes up."""
+        if self.polite_delay <= 0:
+            return
+        host = urlsplit(url).netloc.lower()
+        with _PACE_LOCK:
+            now = time.monotonic()
+            start = max(now, _NEXT_OK.get(host, 0.0))
+            _NEXT_OK[host] = start + self.polite_delay
+        if start > now:
+            time.sleep(start - now)
+
+    def get(self, url: str, *, conditional: bool = False, **kw) -> requests.Response:
+        """GET with pacing and retry; `conditional` opts the URL into the cache
+        (meant for listings and feeds that are refetched every run)."""
+        backoff = 0.5
+        last = None
+        cache = self.cache if conditional else None
+        kw.setdefault("timeout", self.timeout)
+        kw["headers"] = {**self.headers, **(kw.get("headers") or {})}
+        if cache is not None:
+            kw["headers"].update(cache.validators(url))
+        for _ in range(self.max_retries):
+            self._wait_turn(url)
+            r = _session().get(url, **kw)
+            if r.status_code in RETRY_STATUSES:
+                try:
+                    sleep = float(r.headers.get("Retry-After") or backoff)
+                except ValueError:  # HTTP-date form
+                    sleep = backoff
+                LOG.debug("%s backoff %ss for %s (%s)", self.label, sleep, url, r.status_code)
+                time.sleep(sleep)
+                backoff = min(backoff * 2, 8.0)
+                last = r
+                continue
+            r.raise_for_status()
+            if cache is not None:
+                cache.update(url, r)
+            return r
+        if last is not None:
+            last.raise_for_status()
+        raise RuntimeError(f"{self.label} request failed and no response to raise")
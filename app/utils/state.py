@@ -5,6 +5,7 @@
 from __future__ import annotations
 import json
 import logging
+import os
 import tempfile
 from pathlib import Path
 from typing import Set
@@ -12,10 +13,15 @@ from typing import Set
 LOG = logging.getLogger("igwatch")
 
 
+def _dumps(items: list) -> bytes:
+    """Compact UTF-8 JSON array plus trailing newline."""
+    return (json.dumps(items, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
 class State:
     """Atomic JSON-backed set for seen URLs (or arbitrary strings).
 
-    File format: JSON array of strings (sorted on write). Backward-compatible with
+    File format: JSON array of strings (unordered). Backward-compatible with
     newline-delimited text: each non-empty line is treated as one entry.
     If the file isn't valid UTF-8 (legacy SQLite or binary), it will be moved aside
     with a .bak suffix and we start fresh.
@@ -24,21 +30,30 @@ class State:
     def __init__(self, path: str | Path):
         self._path = Path(path)
         self._seen: Set[str] = set()
+        self._dirty = False
         self._load()
 
     def has(self, key: str) -> bool:
         return key in self._seen
 
     def add(self, key: str) -> None:
-        self._seen.add(key)
+        if key not in self._seen:
+            self._seen.add(key)
+            self._dirty = True
 
     def save(self) -> None:
+        """Persist atomically (write temp, fsync, rename). No-op if nothing was added."""
+        if not self._dirty and self._path.exists():
+            return
         self._path.parent.mkdir(parents=True, exist_ok=True)
-        data = json.dumps(sorted(self._seen), ensure_ascii=False)
-        with tempfile.NamedTemporaryFile("w", dir=str(self._path.parent), delete=False) as tmp:
-            tmp.write(data + "\n")
+        with tempfile.NamedTemporaryFile("wb", dir=str(self._path.parent), delete=False) as tmp:
+            # Order is irrelevant to _load; skip the O(n log n) sort of the whole set
+            tmp.write(_dumps(list(self._seen)))
+            tmp.flush()
+            os.fsync(tmp.fileno())
             tmp_path = Path(tmp.name)
         tmp_path.replace(self._path)
+        self._dirty = False
 
     # ----------------------- internal -----------------------
 
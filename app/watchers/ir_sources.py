@@ -6,17 +6,17 @@
 from __future__ import annotations
 import os
 import re
-import time
 import logging
 from typing import List, Tuple, Dict, Any, Optional, Iterable
 from datetime import datetime, timedelta, timezone
 
-import requests
 import feedparser
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin
 from dateutil import parser as dateparser
 
+from ..utils.http import ConditionalCache, PoliteClient
+
 LOG = logging.getLogger("igwatch")
 
 # ---------------------------------------------------------------------
@@ -26,40 +26,8 @@ DEFAULT_KEYWORDS = re.compile(
     r"(results|earnings|trading update|quarter|q[1-4]|interim|half[-\s]?year|halfyear|h1|h2|full[-\s]?year|fy|financial statements|annual report)",
     re.I,
 )
-
-
-class _Http:
-    """Polite HTTP client with retry/backoff."""
-
-    def __init__(self, ua: Optional[str] = None, max_retries: int = 5, polite_delay: float = 0.2):
-        self.s = requests.Session()
-        self.s.headers.update({
-            "User-Agent": ua or os.getenv("IR_USER_AGENT") or os.getenv("SEC_USER_AGENT") or "igwatch (contact: support@example.com)",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Encoding": "gzip, deflate",
-            "Connection": "keep-alive",
-        })
-        self.max_retries = max_retries
-        self.polite_delay = polite_delay
-
-    def get(self, url: str, **kw) -> requests.Response:
-        backoff = 0.5
-        last = None
-        for _ in range(self.max_retries):
-            r = self.s.get(url, timeout=30, **kw)
-            if r.status_code in (403, 429):
-                sleep = float(r.headers.get("Retry-After") or backoff)
-                LOG.debug("IR backoff %ss for %s (%s)", sleep, url, r.status_code)
-                time.sleep(sleep)
-                backoff = min(backoff * 2, 8.0)
-                last = r
-                continue
-            r.raise_for_status()
-            time.sleep(self.polite_delay)
-            return r
-        if last is not None:
-            last.raise_for_status()
-        raise RuntimeError("IR request failed and no response to raise")
+# CSS classes that usually mark a date element next to a listing link
+DATE_CLASS_RE = re.compile(r"date|time|posted|publish", re.I)
 
 
 # ---------------------------------------------------------------------
@@ -88,6 +56,10 @@ def _abs_url(base: str, href: str) -> str:
         return href
 
 
+def _is_date_tag(tag) -> bool:
+    return tag.name in ("span", "div") and bool(DATE_CLASS_RE.search(" ".join(tag.get("class", []) or [])))
+
+
 def _load_issuers_from_yaml(yaml_path: str) -> List[Dict[str, Any]]:
     issuers: List[Dict[str, Any]] = []
     if not yaml_path or not os.path.exists(yaml_path):
@@ -116,7 +88,15 @@ def _load_issuers_from_yaml(yaml_path: str) -> List[Dict[str, Any]]:
     return issuers
 
 
-def _extract_items_from_html(html: str, base_url: str, item_selector: Optional[str], date_selector: Optional[str]) -> List[Tuple[str, str, Optional[datetime]]]:
+def _extract_items_from_html(
+    html: str,
+    base_url: str,
+    item_selector: Optional[str],
+    date_selector: Optional[str],
+    keywords: Optional[re.Pattern] = None,
+) -> List[Tuple[str, str, Optional[datetime]]]:
+    """(url, title, date) for listing links; titles not matching `keywords` are skipped
+    before any date lookup, which is the expensive part (DOM climbing + fuzzy parse)."""
     soup = BeautifulSoup(html, "lxml")
     out: List[Tuple[str, str, Optional[datetime]]] = []
 
@@ -133,6 +113,10 @@ def _extract_items_from_html(html: str, base_url: str, item_selector: Optional[s
         ".press-release a",
     ])
 
+    # Page-level fallback date, looked up at most once per page
+    page_dt: Optional[datetime] = None
+    page_dt_done = False
+
     seen = set()
     for sel in selectors:
         for a in soup.select(sel):
@@ -140,6 +124,9 @@ def _extract_items_from_html(html: str, base_url: str, item_selector: Optional[s
             title = a.get_text(strip=True)
             if not href or not title:
                 continue
+            # Also lets a later, properly titled link win over e.g. a "Read more" one
+            if keywords is not None and not keywords.search(title):
+                continue
             url = _abs_url(base_url, href)
             # de-dup
             if url in seen:
@@ -164,16 +151,19 @@ def _extract_items_from_html(html: str, base_url: str, item_selector: Optional[s
                         dt = _safe_parse_date(t.get("datetime") or t.get_text(strip=True))
                         if dt:
                             break
-                    dspan = parent.find(lambda tag: tag.name in ("span", "div") and re.search(r"date|time|posted|publish", " ".join(tag.get("class", []) or []), re.I))
+                    dspan = parent.find(_is_date_tag)
                     if dspan and dspan.get_text(strip=True):
                         dt = _safe_parse_date(dspan.get_text(strip=True))
                         if dt:
                             break
             if dt is None:
                 # meta tag fallback
-                meta = soup.find("meta", {"property": "article:published_time"})
-                if meta and meta.get("content"):
-                    dt = _safe_parse_date(meta["content"])
+                if not page_dt_done:
+                    meta = soup.find("meta", {"property": "article:published_time"})
+                    if meta and meta.get("content"):
+                        page_dt = _safe_parse_date(meta["content"])
+                    page_dt_done = True
+                dt = page_dt
 
             out.append((url, title, dt))
 
@@ -207,17 +197,28 @@ class IrSourcesWatcher:
       - IR_USER_AGENT (optional UA)
     """
 
-    def __init__(self, start_days: Optional[int] = None):
+    def __init__(self, start_days: Optional[int] = None, cache: Optional[ConditionalCache] = None):
         self.start_days = int(start_days if start_days is not None else os.getenv("START_FROM_DAYS", 90))
-        self.client = _Http()
+        self.client = PoliteClient(os.getenv("IR_USER_AGENT") or os.getenv("SEC_USER_AGENT"), label="IR", cache=cache)
         kw_env = os.getenv("IR_KEYWORDS", "")
         self.keywords = re.compile(kw_env, re.I) if kw_env else DEFAULT_KEYWORDS
         self.yaml_path = os.getenv("IR_SOURCES_YAML", "data/issuers.yaml")
 
     # ---- RSS path ----
     def _poll_rss(self, feed_url: str) -> Iterable[Tuple[str, str, Optional[datetime]]]:
+        # Fetch through the shared client (UA, keep-alive, pacing, retries)
+        # rather than letting feedparser open its own urllib connection.
         try:
-            fp = feedparser.parse(feed_url)
+            r = self.client.get(feed_url, conditional=True)
+        except Exception as e:
+            LOG.warning("IR RSS fetch failed: %s (%s)", feed_url, e)
+            return []
+        try:
+            # content-location lets feedparser resolve relative entry links
+            fp = feedparser.parse(r.content, response_headers={
+                "content-location": r.url,
+                "content-type": r.headers.get("Content-Type", "application/xml"),
+            })
         except Exception as e:
             LOG.warning("IR RSS parse failed: %s (%s)", feed_url, e)
             return []
@@ -242,11 +243,11 @@ class IrSourcesWatcher:
     # ---- HTML path ----
     def _poll_html(self, page_url: str, item_sel: Optional[str], date_sel: Optional[str]) -> Iterable[Tuple[str, str, Optional[datetime]]]:
         try:
-            html = self.client.get(page_url).text
+            html = self.client.get(page_url, conditional=True).text
         except Exception as e:
             LOG.warning("IR page fetch failed: %s (%s)", page_url, e)
             return []
-        return _extract_items_from_html(html, page_url, item_sel, date_sel)
+        return _extract_items_from_html(html, page_url, item_sel, date_sel, self.keywords)
 
     def poll(self) -> List[Tuple[str, str]]:
         issuers = _load_issuers_from_yaml(self.yaml_path)
@@ -270,12 +271,13 @@ class IrSourcesWatcher:
             if page:
                 items.extend(self._poll_html(page, item_sel, date_sel))
 
+            # Cheapest gates first: set lookup, date compare, then the regex
             for url, title, dt in items:
-                if not self.keywords.search(title or ""):
+                if url in seen_urls:
                     continue
                 if dt is not None and dt < cutoff:
                     continue
-                if url in seen_urls:
+                if not self.keywords.search(title or ""):
                     continue
                 seen_urls.add(url)
                 results.append((url, title))
@@ -6,14 +6,14 @@
 from __future__ import annotations
 import os
 import re
-import time
 import logging
 from typing import List, Tuple, Optional
 from datetime import datetime, timedelta, timezone
 
-import requests
 from bs4 import BeautifulSoup
 
+from ..utils.http import ConditionalCache, PoliteClient
+
 LOG = logging.getLogger("igwatch")
 
 # ------------------------- Config & Defaults -------------------------
@@ -24,40 +24,6 @@ DEFAULT_KEYWORDS = re.compile(
 LSE_BASE = "https://www.londonstockexchange.com"
 
 
-class _Http:
-    """Polite HTTP client with retry/backoff for LSE pages."""
-
-    def __init__(self, ua: Optional[str] = None, max_retries: int = 5, polite_delay: float = 0.25):
-        self.s = requests.Session()
-        self.s.headers.update({
-            "User-Agent": ua or os.getenv("LSE_USER_AGENT") or os.getenv("SEC_USER_AGENT") or "igwatch (contact: support@example.com)",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Encoding": "gzip, deflate",
-            "Connection": "keep-alive",
-        })
-        self.max_retries = max_retries
-        self.polite_delay = polite_delay
-
-    def get(self, url: str, **kw) -> requests.Response:
-        backoff = 0.5
-        last = None
-        for _ in range(self.max_retries):
-            r = self.s.get(url, timeout=30, **kw)
-            if r.status_code in (403, 429):
-                sleep = float(r.headers.get("Retry-After") or backoff)
-                LOG.debug("LSE backoff %ss for %s (%s)", sleep, url, r.status_code)
-                time.sleep(sleep)
-                backoff = min(backoff * 2, 8.0)
-                last = r
-                continue
-            r.raise_for_status()
-            time.sleep(self.polite_delay)
-            return r
-        if last is not None:
-            last.raise_for_status()
-        raise RuntimeError("LSE request failed and no response to raise")
-
-
 # ------------------------- Parsing helpers -------------------------
 
 def _abs_url(href: str) -> str:
@@ -68,15 +34,31 @@ def _abs_url(href: str) -> str:
     return LSE_BASE + href
 
 
+def _is_date_tag(tag) -> bool:
+    return tag.name in ("span", "div") and "date" in " ".join(tag.get("class", []))
+
+
+def _as_utc(dt: datetime) -> datetime:
+    if not dt.tzinfo:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
 def _parse_date(text: str) -> Optional[datetime]:
     text = (text or "").strip()
+    if not text:
+        return None
+    # <time datetime="..."> and meta tags carry ISO 8601; fromisoformat is a
+    # single C-level parse, where the strptime loop would raise twice first.
+    if text[:4].isdigit() and text[4:5] == "-":
+        try:
+            return _as_utc(datetime.fromisoformat(text))
+        except ValueError:
+            pass
     # Common formats seen on LSE (examples): "21 Aug 2025 07:00"
     for fmt in ("%d %b %Y %H:%M", "%d %b %Y", "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%d"):
         try:
-            dt = datetime.strptime(text, fmt)
-            if not dt.tzinfo:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt.astimezone(timezone.utc)
+            return _as_utc(datetime.strptime(text, fmt))
         except ValueError:
             continue
     return None
@@ -108,7 +90,7 @@ def _extract_items_from_list_html(html: str, epic: str) -> List[Tuple[str, str,
                 date_txt = time_el.get("datetime") or time_el.get_text(strip=True)
                 break
             # look for generic date spans
-            dspan = parent.find(lambda tag: tag.name in ("span", "div") and "date" in " ".join(tag.get("class", [])))
+            dspan = parent.find(_is_date_tag)
             if dspan and dspan.get_text(strip=True):
                 date_txt = dspan.get_text(strip=True)
                 break
@@ -135,7 +117,7 @@ def _extract_items_from_list_html(html: str, epic: str) -> List[Tuple[str, str,
             if t and (t.get("datetime") or t.get_text(strip=True)):
                 dt = _parse_date(t.get("datetime") or t.get_text(strip=True))
             else:
-                dspan = item.find(lambda tag: tag.name in ("span", "div") and "date" in " ".join(tag.get("class", [])))
+                dspan = item.find(_is_date_tag)
                 if dspan:
                     dt = _parse_date(dspan.get_text(strip=True))
             out.append((url, title, dt))
@@ -143,7 +125,7 @@ def _extract_items_from_list_html(html: str, epic: str) -> List[Tuple[str, str,
     return out
 
 
-def _fetch_detail_date(client: _Http, url: str) -> Optional[datetime]:
+def _fetch_detail_date(client: PoliteClient, url: str) -> Optional[datetime]:
     try:
         html = client.get(url).text
     except Exception:
@@ -176,10 +158,12 @@ class RnsLseWatcher:
       - LSE_KEYWORDS (override keywords; regex or simple words separated by '|')
     """
 
-    def __init__(self, start_days: Optional[int] = None):
+    def __init__(self, start_days: Optional[int] = None, cache: Optional[ConditionalCache] = None):
         self.start_days = int(start_days if start_days is not None else os.getenv("START_FROM_DAYS", 90))
         self.max_pages = int(os.getenv("LSE_MAX_PAGES", 2))
-        self.client = _Http()
+        self.client = PoliteClient(
+            os.getenv("LSE_USER_AGENT") or os.getenv("SEC_USER_AGENT"), label="LSE", polite_delay=0.25, cache=cache
+        )
         # Compile keyword regex
         kw_env = os.getenv("LSE_KEYWORDS", "")
         self.keywords = re.compile(kw_env, re.I) if kw_env else DEFAULT_KEYWORDS
@@ -201,12 +185,15 @@ class RnsLseWatcher:
 
         cutoff = datetime.now(timezone.utc) - timedelta(days=self.start_days)
         results: List[Tuple[str, str]] = []
+        # Cards often link twice (headline + "read more") and pages shift as
+        # new RNS arrive, so the same URL can recur within one poll.
+        seen_urls: set[str] = set()
 
         for epic in epics:
             for page in range(1, self.max_pages + 1):
                 url = self._list_url(epic, page)
                 try:
-                    html = self.client.get(url).text
+                    html = self.client.get(url, conditional=True).text
                 except Exception as e:
                     LOG.warning("LSE list fetch failed for %s p%d: %s", epic, page, e)
                     continue
@@ -219,9 +206,14 @@ class RnsLseWatcher:
                     break
 
                 for item_url, title, dt in items:
+                    if item_url in seen_urls:
+                        continue
                     # Quick keyword screen
                     if not self.keywords.search(title or ""):
                         continue
+                    # Claim the URL once the title matches (a "Read more" link must not),
+                    # so a repeat never pays for a second detail fetch, in or out of window
+                    seen_urls.add(item_url)
                     # Ensure we have a date; fetch detail if missing and title matched
                     if dt is None:
                         dt = _fetch_detail_date(self.client, item_url)
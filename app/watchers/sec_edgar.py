@@ -5,12 +5,13 @@
 from __future__ import annotations
 import os
 import re
-import time
 import logging
+from itertools import chain, repeat
 from typing import List, Tuple, Dict, Any
 from datetime import datetime, timedelta, timezone
 
-import requests
+from ..utils.http import ConditionalCache, PoliteClient
+
 try:
     import yaml  # optional for YAML issuer lists
 except Exception:  # pragma: no cover
@@ -19,9 +20,13 @@ except Exception:  # pragma: no cover
 LOG = logging.getLogger("igwatch")
 
 # Default set of forms relevant to earnings/financial updates
-DEFAULT_FORMS: set[str] = {"10-Q", "10-K", "8-K", "6-K", "20-F", "40-F"}
+DEFAULT_FORMS: frozenset[str] = frozenset({"10-Q", "10-K", "8-K", "6-K", "20-F", "40-F"})
 # If present in 8-K body, this indicates an earnings release/update
 ITEM_8K_EARNINGS = re.compile(r"\bItem\s*2\.02\b", re.I)
+# Exhibit 99.1 link in a filing index page (common for earnings PRs)
+EX_99_1_HREF = re.compile(r'href=\"([^\"]+?)\"[^>]*>\s*(?:EX|Exhibit)[-\s]?99\.1', re.I)
+# filingDate format in the submissions JSON
+ISO_DAY = re.compile(r"\d{4}-\d{2}-\d{2}")
 
 
 # ---------------------------- URL helpers ----------------------------
@@ -43,42 +48,6 @@ def _index_url(cik: str, acc: str) -> str:
     return f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/{_acc_folder(acc)}/{acc}-index.html"
 
 
-# ---------------------------- HTTP client ----------------------------
-
-class _SecClient:
-    """Small HTTP client with polite pacing and retry for SEC endpoints."""
-
-    def __init__(self, ua: str | None, max_retries: int = 5, polite_delay: float = 0.2):
-        self.s = requests.Session()
-        self.s.headers.update({
-            "User-Agent": ua or "igwatch (contact: support@example.com)",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Encoding": "gzip, deflate",
-            "Connection": "keep-alive",
-        })
-        self.max_retries = max_retries
-        self.polite_delay = polite_delay
-
-    def get(self, url: str, **kw) -> requests.Response:
-        backoff = 0.5
-        last = None
-        for _ in range(self.max_retries):
-            r = self.s.get(url, timeout=30, **kw)
-            if r.status_code in (403, 429):
-                sleep = float(r.headers.get("Retry-After") or backoff)
-                LOG.debug("SEC backoff %ss for %s (%s)", sleep, url, r.status_code)
-                time.sleep(sleep)
-                backoff = min(backoff * 2, 8.0)
-                last = r
-                continue
-            r.raise_for_status()
-            time.sleep(self.polite_delay)  # be nice to sec.gov
-            return r
-        if last is not None:
-            last.raise_for_status()
-        raise RuntimeError("SEC request failed and no response to raise")
-
-
 # ---------------------------- Issuer config ----------------------------
 
 def _load_issuers_from_yaml(yaml_path: str | None) -> List[Dict[str, Any]]:
@@ -121,11 +90,11 @@ def _issuers_from_env() -> List[Dict[str, Any]]:
     return uniq
 
 
-def _forms_set() -> set[str]:
+def _forms_set() -> frozenset[str]:
     env = os.getenv("SEC_FORMS", "")
     if not env:
-        return set(DEFAULT_FORMS)
-    return {x.strip().upper() for x in env.split(",") if x.strip()}
+        return DEFAULT_FORMS
+    return frozenset(x.strip().upper() for x in env.split(",") if x.strip())
 
 
 # ---------------------------- Watcher ----------------------------
@@ -141,17 +110,42 @@ class SecEdgarWatcher:
       - START_FROM_DAYS (lookback window; if absent, defaults to 90)
     """
 
-    def __init__(self, start_days: int | None = None):
+    def __init__(self, start_days: int | None = None, cache: ConditionalCache | None = None):
         lookback = start_days if start_days is not None else int(os.getenv("START_FROM_DAYS", "90"))
         self.start_days = int(lookback)
         self.ua = os.getenv("SEC_USER_AGENT") or "igwatch (contact: support@example.com)"
-        self.client = _SecClient(self.ua)
+        self.client = PoliteClient(self.ua, label="SEC", cache=cache)
         self.forms = _forms_set()
+        self._tmap: Dict[str, str] | None = None
 
     def _ticker_map(self) -> Dict[str, str]:
-        data = self.client.get("https://www.sec.gov/files/company_tickers.json").json()
-        # map ticker (lower) -> zero-padded CIK
-        return {v["ticker"].lower(): f"{int(v['cik_str']):010d}" for v in data.values()}
+        """Ticker (lower) -> zero-padded CIK, fetched on first use (large file; skipped if all CIKs are known)."""
+        if self._tmap is None:
+            data = self.client.get("https://www.sec.gov/files/company_tickers.json").json()
+            self._tmap = {v["ticker"].lower(): f"{int(v['cik_str']):010d}" for v in data.values()}
+        return self._tmap
+
+    def _resolve_8k(self, cik: str, acc: str, primary: str) -> str | None:
+        """URL to report for an 8-K: its Exhibit 99.1 when the body lacks Item 2.02."""
+        url = _primary_url(cik, acc, primary)
+        try:
+            body = self.client.get(url).text
+            # For 8-K, try to ensure it's an earnings-related exhibit
+            if not ITEM_8K_EARNINGS.search(body or ""):
+                idx = self.client.get(_index_url(cik, acc)).text
+                # Prefer Exhibit 99.1 if present (common for earnings PRs)
+                m = EX_99_1_HREF.search(idx)
+                if m:
+                    url = _primary_url(cik, acc, m.group(1))
+        except Exception:
+            # Primary may be blocked or missing; use index as a fallback
+            try:
+                self.client.get(_index_url(cik, acc))
+                url = _index_url(cik, acc)
+            except Exception as e2:  # pragma: no cover
+                LOG.warning("SEC: failed both primary/index for %s 8-K %s (%s)", cik, acc, e2)
+                return None
+        return url
 
     def poll(self) -> List[Tuple[str, str]]:
         issuers = _issuers_from_env()
@@ -160,54 +154,52 @@ class SecEdgarWatcher:
             return []
 
         cutoff = datetime.now(timezone.utc) - timedelta(days=self.start_days)
-        tmap = self._ticker_map()
+        # filingDate is "YYYY-MM-DD", so the window check is a plain string
+        # comparison; a filing dated on the cutoff day (midnight) is already outside it.
+        cutoff_day = cutoff.date().isoformat()
         out: List[Tuple[str, str]] = []
 
         for iss in issuers:
             cik = iss.get("cik")
             ticker = (iss.get("ticker") or "").lower()
             if not cik and ticker:
-                cik = tmap.get(ticker)
+                # Only pay for the ticker map when an issuer lacks an explicit CIK
+                cik = self._ticker_map().get(ticker)
             if not cik:
                 continue
 
-            subs = self.client.get(f"https://data.sec.gov/submissions/CIK{_pad_cik(cik)}.json").json()
+            subs = self.client.get(
+                f"https://data.sec.gov/submissions/CIK{_pad_cik(cik)}.json", conditional=True
+            ).json()
             recent = subs.get("filings", {}).get("recent", {})
             rows = zip(
                 recent.get("form", []),
                 recent.get("filingDate", []),
                 recent.get("accessionNumber", []),
-                recent.get("primaryDocument", []),
+                # A missing or short primaryDocument list must not drop filings
+                # (zip stops at the shortest); those rows get the index page.
+                chain(recent.get("primaryDocument") or (), repeat("")),
             )
 
             for form, fdate, acc, primary in rows:
                 if form not in self.forms:
                     continue
-                try:
-                    d = datetime.strptime(fdate, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-                except Exception:
-                    continue
-                if d < cutoff:
+                if not isinstance(fdate, str) or not ISO_DAY.fullmatch(fdate) or fdate <= cutoff_day:
                     continue
 
-                # Prefer primary document; otherwise fall back to index
-                url = _primary_url(cik, acc, primary)
-                try:
-                    body = self.client.get(url).text
-                    # For 8-K, try to ensure it's an earnings-related exhibit
-                    if form == "8-K" and not ITEM_8K_EARNINGS.search(body or ""):
-                        idx = self.client.get(_index_url(cik, acc)).text
-                        # Prefer Exhibit 99.1 if present (common for earnings PRs)
-                        m = re.search(r'href=\"([^\"]+?)\"[^>]*>\s*(?:EX|Exhibit)[-\s]?99\.1', idx, re.I)
-                        if m:
-                            url = _primary_url(cik, acc, m.group(1))
-                except Exception:
-                    # Primary may be blocked or missing; use index as a fallback
-                    try:
-                        self.client.get(_index_url(cik, acc))
-                        url = _index_url(cik, acc)
-                    except Exception as e2:  # pragma: no cover
-                        LOG.warning("SEC: failed both primary/index for %s %s %s (%s)", cik, form, acc, e2)
+                # Prefer primary document; otherwise fall back to the index page,
+                # which every filing has, so it is reported without a request
+                primary = (primary or "").strip()
+                if not primary:
+                    url = _index_url(cik, acc)
+                elif form != "8-K":
+                    # Only 8-Ks need their body inspected here. Periodic reports
+                    # (10-K/10-Q/20-F...) run to megabytes and are fetched again
+                    # by the parser anyway, so don't download them just to probe.
+                    url = _primary_url(cik, acc, primary)
+                else:
+                    url = self._resolve_8k(cik, acc, primary)
+                    if url is None:
                         continue
 
                 # Compose a readable title
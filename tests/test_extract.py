@@ -0,0 +1,40 @@
+# tests/test_extract.py
+import pytest
+
+from app.parsers.extract import _find_metric
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        # The figure, not the percentage change that precedes it
+        ("Revenue increased 12% to £450m", "£450m"),
+        ("Group revenue was up 15% at $2.1 billion", "$2.1 billion"),
+        # Not the quarter digit or the year of a period label
+        ("Revenue for Q3 2025 was $1.2 billion", "$1.2 billion"),
+        ("Total revenue of $1,234.5 million, up 12%", "$1,234.5 million"),
+    ],
+)
+def test_revenue_picks_the_figure(text, expected):
+    assert _find_metric(text, "revenue").current == expected
+
+
+def test_metric_values_by_name():
+    assert _find_metric("Net income was $10.1 million", "net_income").current == "$10.1 million"
+    assert _find_metric("Diluted EPS of $0.45", "eps").current == "$0.45"
+
+
+def test_yoy_stays_with_its_own_sentence():
+    text = (
+        "Total revenue of $1,234.5 million, up 12% year-over-year. "
+        "Adjusted EBITDA was $300 million, down 3%"
+    )
+    assert _find_metric(text, "revenue").yoy == "up 12%"
+    assert _find_metric(text, "ebitda").yoy == "down 3%"
+
+
+def test_yoy_prefers_the_change_next_to_the_figure():
+    text = "Revenue of $2.1bn, up 9% vs. prior year, while adjusted EBITDA of $300m fell 2%"
+    assert _find_metric(text, "revenue").yoy == "up 9%"
+    assert _find_metric(text, "ebitda").yoy == "fell 2%"
+    assert _find_metric("Revenue increased 12% to £450m", "revenue").yoy == "increased 12%"
@@ -0,0 +1,86 @@
+# tests/test_http.py
+import functools
+import http.server
+import json
+import threading
+
+import pytest
+
+from app.utils.http import ConditionalCache, PoliteClient
+
+
+class _Handler(http.server.SimpleHTTPRequestHandler):
+    # Serves files with Last-Modified and answers If-Modified-Since with 304
+    statuses = []
+
+    def send_response(self, code, message=None):
+        type(self).statuses.append(code)
+        super().send_response(code, message)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(tmp_path):
+    root = tmp_path / "www"
+    root.mkdir()
+    _Handler.statuses = []
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_Handler, directory=str(root)))
+    t = threading.Thread(target=httpd.serve_forever, daemon=True)
+    t.start()
+    yield root, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _run(cache_path, url, **kw):
+    cache = ConditionalCache(cache_path)
+    r = PoliteClient("test", polite_delay=0, cache=cache).get(url, **kw)
+    cache.save()
+    return r
+
+
+def test_304_replays_the_cached_body_across_runs(server, tmp_path):
+    root, base = server
+    # Not valid UTF-8: the cached copy must come back byte for byte
+    body = b"<rss><title>Caf\xe9 results</title></rss>"
+    (root / "feed.xml").write_bytes(body)
+    cache_path = tmp_path / "http_cache.json"
+
+    first = _run(cache_path, f"{base}/feed.xml", conditional=True)
+    second = _run(cache_path, f"{base}/feed.xml", conditional=True)
+
+    assert _Handler.statuses == [200, 304]
+    assert first.content == second.content == body
+    assert second.text == first.text
+    assert "If-Modified-Since" in second.request.headers
+    assert list(json.loads(cache_path.read_text(encoding="utf-8"))) == [f"{base}/feed.xml"]
+
+
+def test_only_conditional_calls_use_the_cache(server, tmp_path):
+    root, base = server
+    (root / "doc.html").write_bytes(b"<p>filing</p>")
+    cache_path = tmp_path / "http_cache.json"
+
+    _run(cache_path, f"{base}/doc.html")
+    _run(cache_path, f"{base}/doc.html")
+
+    assert _Handler.statuses == [200, 200]
+    assert not cache_path.exists()
+
+
+def test_entries_not_used_in_a_run_expire(server, tmp_path):
+    root, base = server
+    (root / "a.xml").write_bytes(b"<a/>")
+    (root / "b.xml").write_bytes(b"<b/>")
+    cache_path = tmp_path / "http_cache.json"
+
+    cache = ConditionalCache(cache_path)
+    client = PoliteClient("test", polite_delay=0, cache=cache)
+    client.get(f"{base}/a.xml", conditional=True)
+    client.get(f"{base}/b.xml", conditional=True)
+    cache.save()
+    _run(cache_path, f"{base}/a.xml", conditional=True)
+
+    assert list(json.loads(cache_path.read_text(encoding="utf-8"))) == [f"{base}/a.xml"]
@@ -0,0 +1,168 @@
+# tests/test_main.py
+import threading
+import time
+
+from app.main import _FetchPool
+
+
+def _tracking_job(log, lock, running):
+    def job(host, n):
+        with lock:
+            running[host] = running.get(host, 0) + 1
+            log.append((time.monotonic(), host, running[host], sum(running.values())))
+        time.sleep(0.05)
+        with lock:
+            running[host] -= 1
+        return (host, n)
+    return job
+
+
+def test_fetch_pool_runs_hosts_side_by_side():
+    log, lock, running = [], threading.Lock(), {}
+    pool = _FetchPool(_tracking_job(log, lock, running), workers=6, per_host=2)
+    t0 = time.monotonic()
+    # A backlog for one host submitted first must not hold every worker
+    for n in range(12):
+        pool.submit("www.sec.gov", "www.sec.gov", n)
+    for n in range(4):
+        pool.submit("www.londonstockexchange.com", "www.londonstockexchange.com", n)
+    results = pool.results()
+
+    assert results == [("www.sec.gov", n) for n in range(12)] + [("www.londonstockexchange.com", n) for n in range(4)]
+    first_lse = min(t for t, host, _, _ in log if host == "www.londonstockexchange.com")
+    assert first_lse - t0 < 0.04
+    assert max(per_host for _, _, per_host, _ in log) <= 2
+    assert max(total for _, _, _, total in log) <= 6
+
+
+def test_fetch_pool_survives_a_failing_job():
+    def job(n):
+        if n == 1:
+            raise RuntimeError("boom")
+        return n
+
+    pool = _FetchPool(job, workers=2, per_host=1)
+    for n in range(3):
+        pool.submit(f"h{n}", n)
+    assert pool.results() == [0, None, 2]
+
+
+class _Watcher:
+    def __init__(self, items, delay=0.0):
+        self.items, self.delay = items, delay
+
+    def poll(self):
+        time.sleep(self.delay)
+        return self.items
+
+
+def test_later_watcher_is_not_starved_by_a_busy_host(monkeypatch, tmp_path):
+    from app import config, main
+    from app.utils.state import State
+
+    started = {}
+
+    def fake_summarize(url, title):
+        started.setdefault(url, time.monotonic())
+        time.sleep(0.05)
+        return url, title, ""
+
+    monkeypatch.setattr(main, "_summarize", fake_summarize)
+    monkeypatch.setattr(config, "FETCH_WORKERS", 6)
+    monkeypatch.setattr(config, "FETCH_PER_HOST", 2)
+    sec = _Watcher([(f"https://www.sec.gov/doc{n}", f"S{n}") for n in range(12)])
+    lse = _Watcher([(f"https://www.londonstockexchange.com/n{n}", f"L{n}") for n in range(4)], delay=0.02)
+
+    t0 = time.monotonic()
+    keys, rendered = main._discover_and_fetch(State(tmp_path / "seen.json"), [sec, lse])
+
+    assert [r[1] for r in rendered] == [f"S{n}" for n in range(12)] + [f"L{n}" for n in range(4)]
+    first_lse = min(t for u, t in started.items() if "londonstockexchange" in u)
+    # SEC alone needs 6 rounds of 50ms at 2 per host; LSE must not wait for them
+    assert first_lse - t0 < 0.1
+
+
+# ---------------------------- dedupe & delivery ----------------------------
+
+def test_canon_url_drops_tracking_and_fragment():
+    from app.main import _canon_url
+
+    assert (
+        _canon_url("HTTPS://Investors.Example.com/news?b=2&utm_source=x&a=1&fbclid=z#top")
+        == "https://investors.example.com/news?a=1&b=2"
+    )
+
+
+def test_discovery_dedupes_canonical_urls_and_honours_legacy_raw_entries(monkeypatch, tmp_path):
+    from app import main
+    from app.utils.state import State
+
+    monkeypatch.setattr(main, "_summarize", lambda url, title: (url, title, ""))
+    state = State(tmp_path / "seen.json")
+    # Saved by an older run, before keys were canonicalised
+    state.add("https://example.com/old?utm_source=feed")
+    items = [
+        ("https://example.com/a?utm_medium=rss", "A"),
+        ("https://EXAMPLE.com/a#more", "A again"),
+        ("https://example.com/old?utm_source=feed", "Old"),
+        ("https://example.com/b", "B"),
+    ]
+
+    keys, rendered = main._discover_and_fetch(state, [_Watcher(items)])
+
+    assert keys == ["https://example.com/a", "https://example.com/b"]
+    assert [r[1] for r in rendered] == ["A", "B"]
+
+
+def test_outgoing_dedupes_on_the_final_url(tmp_path):
+    from app.main import _outgoing
+    from app.utils.state import State
+
+    state = State(tmp_path / "seen.json")
+    state.add("https://example.com/sent")
+    keys = ["https://example.com/feed-1", "https://example.com/page-1", "https://example.com/feed-2", "https://example.com/x"]
+    rendered = [
+        ("https://example.com/doc?utm_source=x", "s1", "b1"),
+        ("https://example.com/doc", "s2", "b2"),  # same document, already queued
+        ("https://example.com/sent", "s3", "b3"),  # sent by an earlier run
+        None,  # fetch failed
+    ]
+
+    out = _outgoing(state, keys, rendered)
+
+    assert out == [(("https://example.com/feed-1", "https://example.com/doc"), "s1", "b1")]
+    # The new entry URL for an already-sent document is recorded without a send
+    assert state.has("https://example.com/feed-2")
+    assert not state.has("https://example.com/page-1")
+
+
+class _Session:
+    def __init__(self, ok):
+        self.ok, self.sent = ok, []
+
+    def send(self, subject, body):
+        self.sent.append(subject)
+        return self.ok
+
+
+def test_digest_marks_items_only_after_a_successful_send(monkeypatch, tmp_path):
+    from app import config, main
+    from app.utils.state import State
+
+    monkeypatch.setattr(config, "DRY_RUN", False)
+    monkeypatch.setattr(config, "MAIL_TO", ("ops@example.com",))
+    pending = [
+        (("https://example.com/a",), "A", "body a"),
+        (("https://example.com/b", "https://example.com/b-final"), "B", "body b"),
+    ]
+
+    state = State(tmp_path / "seen.json")
+    failing = _Session(ok=False)
+    main._send_digest(state, pending, failing)
+    assert len(failing.sent) == 1
+    assert not any(state.has(u) for urls, _, _ in pending for u in urls)
+
+    working = _Session(ok=True)
+    main._send_digest(state, pending, working)
+    assert len(working.sent) == 1
+    assert all(state.has(u) for urls, _, _ in pending for u in urls)
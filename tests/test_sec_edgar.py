@@ -0,0 +1,53 @@
+# tests/test_sec_edgar.py
+from datetime import date, timedelta
+
+from app.watchers import sec_edgar
+
+
+class _Resp:
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class _Client:
+    def __init__(self, recent):
+        self.recent = recent
+        self.urls = []
+
+    def get(self, url, **kw):
+        self.urls.append(url)
+        assert "submissions" in url, f"unexpected fetch of {url}"
+        return _Resp({"filings": {"recent": self.recent}})
+
+
+def _watcher(monkeypatch, recent):
+    monkeypatch.setattr(sec_edgar, "_issuers_from_env", lambda: [{"cik": "1234", "ticker": "TST"}])
+    w = sec_edgar.SecEdgarWatcher(start_days=30)
+    w.forms = frozenset({"10-Q", "10-K"})
+    w.client = _Client(recent)
+    return w
+
+
+def test_missing_primary_document_falls_back_to_index_without_a_request(monkeypatch):
+    day = (date.today() - timedelta(days=1)).isoformat()
+    recent = {
+        "form": ["10-Q", "10-K", "10-Q"],
+        "filingDate": [day, day, day],
+        "accessionNumber": ["0000001234-25-000001", "0000001234-25-000002", "0000001234-25-000003"],
+        # Blank for the second filing and absent for the third
+        "primaryDocument": ["q.htm", " "],
+    }
+    w = _watcher(monkeypatch, recent)
+
+    urls = [u for u, _ in w.poll()]
+
+    base = "https://www.sec.gov/Archives/edgar/data/1234"
+    assert urls == [
+        f"{base}/000000123425000001/q.htm",
+        f"{base}/000000123425000002/0000001234-25-000002-index.html",
+        f"{base}/000000123425000003/0000001234-25-000003-index.html",
+    ]
+    assert len(w.client.urls) == 1  # only the submissions JSON
@@ -0,0 +1,28 @@
+# tests/test_state.py
+import json
+
+from app.utils.state import State
+
+
+def test_save_writes_compact_json_and_reloads(tmp_path):
+    path = tmp_path / "seen.json"
+    s = State(path)
+    s.add("https://example.com/a")
+    s.add("https://example.com/é")
+    s.save()
+
+    raw = path.read_text(encoding="utf-8")
+    assert raw.endswith("]\n") and ", " not in raw
+    assert sorted(json.loads(raw)) == ["https://example.com/a", "https://example.com/é"]
+    assert State(path).has("https://example.com/é")
+
+
+def test_loads_legacy_formats(tmp_path):
+    spaced = tmp_path / "spaced.json"
+    spaced.write_text('[\n  "a",\n  "b"\n]\n', encoding="utf-8")
+    assert State(spaced).has("b")
+
+    lines = tmp_path / "seen.txt"
+    lines.write_text("a\n\nb\n", encoding="utf-8")
+    s = State(lines)
+    assert s.has("a") and s.has("b") and not s.has("")